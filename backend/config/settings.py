@@ -3,7 +3,7 @@ SSB Coach 1A Backend Configuration
 Settings and environment management
 """
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List, Optional
 import os
 
@@ -15,11 +15,16 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WORKERS: int = os.cpu_count() or 1
     LOG_LEVEL: str = "INFO"
 
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017/ssbcoach1a"
     REDIS_URL: str = "redis://localhost:6379"
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_CONNECTING: int = 2
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 3000
 
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -29,15 +34,18 @@ class Settings(BaseSettings):
     # CORS
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
     ALLOWED_HOSTS: List[str] = ["localhost", "127.0.0.1"]
+    ENABLE_CORS: bool = True
+    # Disable in production when a load balancer already validates Host
+    ENABLE_TRUSTED_HOST: bool = True
 
     # Features
     INIT_SAMPLE_DATA: bool = True
     ENABLE_AI_FEATURES: bool = True
     ENABLE_ANALYTICS: bool = True
     ENABLE_GAMIFICATION: bool = True
+    # API docs are always on outside production; opt in for production
+    ENABLE_API_DOCS: bool = False
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+SSB Coach 1A Backend - Gunicorn Configuration
+Production process manager running Uvicorn workers on every core
+"""
+
+from config.settings import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 5
+loglevel = settings.LOG_LEVEL.lower()
+# Requests are already logged by TimingMiddleware
+accesslog = None
@@ -3,17 +3,34 @@ SSB Coach 1A - FastAPI Backend Application
 Modern backend API for SSB preparation platform
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, Depends, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
-from contextlib import asynccontextmanager
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from contextlib import asynccontextmanager, suppress
 import uvicorn
+import asyncio
 import os
+import sys
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+import atexit
 import logging
+import orjson
+import queue
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 # Import route modules
 from routes import auth, users, tests, coaches, analytics, admin
@@ -23,8 +40,30 @@ from utils.logging_config import setup_logging
 
 # Setup logging
 setup_logging()
+
+# Hand log records to a background thread so handler I/O never blocks the loop
+_log_queue = queue.SimpleQueue()
+_root_logger = logging.getLogger()
+_log_listener = QueueListener(
+    _log_queue, *_root_logger.handlers, respect_handler_level=True
+)
+_root_logger.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
+# Settings that never change after startup, bound once for hot paths
+ENV = settings.ENVIRONMENT
+VERSION = settings.VERSION
+ALLOWED_ORIGINS = tuple(settings.ALLOWED_ORIGINS)
+ALLOWED_HOSTS = tuple(settings.ALLOWED_HOSTS)
+DOCS_ENABLED = ENV != "production" or settings.ENABLE_API_DOCS
+OPENAPI_URL = "/api/openapi.json"
+DOCS_URL = "/api/docs"
+REDOC_URL = "/api/redoc"
+SWAGGER_OAUTH2_REDIRECT_URL = "/api/docs/oauth2-redirect"
+
 # Security scheme
 security = HTTPBearer()
 
@@ -38,21 +77,44 @@ async def lifespan(app: FastAPI):
     await database.connect()
     logger.info("📊 Connected to MongoDB")
     
+    # Warm up the connection pool so first requests don't pay for handshakes;
+    # an unreachable database must not stop the server from booting
+    try:
+        await asyncio.gather(
+            *(
+                database.db.command("ping")
+                for _ in range(max(1, settings.MONGO_MIN_POOL_SIZE))
+            )
+        )
+        logger.info("🔥 MongoDB connection pool warmed up")
+    except Exception as e:
+        logger.warning(f"⚠️ MongoDB connection pool warmup failed: {str(e)}")
+    
     # Create indexes for better performance
     await create_database_indexes()
-    logger.info("🔧 Database indexes created")
     
     # Initialize sample data if needed
     if settings.INIT_SAMPLE_DATA:
         await init_sample_data()
         logger.info("📝 Sample data initialized")
     
+    # Generate and serialize the OpenAPI schema once; requests behind a
+    # proxy root_path get their own copy serialized on first request
+    if DOCS_ENABLED:
+        openapi_bytes("")
+    
+    # Keep the pre-serialized health check body fresh
+    health_task = asyncio.create_task(refresh_health_bytes())
+    
     logger.info("✅ SSB Coach 1A API Server started successfully!")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down SSB Coach 1A API Server...")
+    health_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await health_task
     await database.disconnect()
     logger.info("👋 Server shutdown complete")
 
@@ -60,61 +122,90 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="SSB Coach 1A API",
     description="Advanced SSB Interview Preparation Platform - Backend API",
-    version="1.0.0",
-    docs_url="/api/docs",
-    redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json",
+    version=VERSION,
+    # Docs and schema routes are registered below to serve cached bytes
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-    allow_headers=["*"],
-)
+# Compress large JSON payloads; tiny bodies such as /health are left as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
-# Trusted host middleware for security
-app.add_middleware(
-    TrustedHostMiddleware, 
-    allowed_hosts=settings.ALLOWED_HOSTS
-)
+# CORS middleware (skipped when there are no origins to allow)
+if settings.ENABLE_CORS and ALLOWED_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+        allow_headers=["*"],
+    )
 
-# Health check endpoint
-@app.get("/health", tags=["Health"])
-async def health_check():
-    """Health check endpoint for load balancers"""
-    return {
+# Trusted host middleware for security (skipped when every host is allowed)
+if (
+    (ENV != "production" or settings.ENABLE_TRUSTED_HOST)
+    and "*" not in ALLOWED_HOSTS
+):
+    app.add_middleware(
+        TrustedHostMiddleware, 
+        allowed_hosts=ALLOWED_HOSTS
+    )
+
+# Static response data serialized once at import time
+_API_INFO = {
+    "name": "SSB Coach 1A API",
+    "version": VERSION,
+    "description": "Advanced SSB Interview Preparation Platform",
+    "features": [
+        "User Authentication & Management",
+        "AI-Powered Test Analysis",
+        "Real-time Analytics",
+        "Gamification System",
+        "Coach & Center Management",
+        "Practice Test Engine",
+        "Progress Tracking",
+        "Admin Dashboard"
+    ],
+    "health": "/health"
+}
+if DOCS_ENABLED:
+    _API_INFO["documentation"] = DOCS_URL
+    _API_INFO["redoc"] = REDOC_URL
+_API_INFO_BYTES = orjson.dumps(_API_INFO)
+
+# Health check body, rebuilt once per second by refresh_health_bytes()
+def build_health_bytes():
+    """Serialize the health check response for the current time"""
+    return orjson.dumps({
         "status": "healthy",
         "timestamp": datetime.utcnow(),
-        "version": "1.0.0",
-        "environment": settings.ENVIRONMENT
-    }
+        "version": VERSION,
+        "environment": ENV
+    })
+
+_HEALTH_BYTES = build_health_bytes()
+
+async def refresh_health_bytes():
+    """Rebuild the cached health check body every second"""
+    global _HEALTH_BYTES
+    while True:
+        _HEALTH_BYTES = build_health_bytes()
+        await asyncio.sleep(1)
+
+# Health check endpoint (GET is answered by HealthCheckMiddleware)
+@app.get("/health", response_class=Response, tags=["Health"])
+async def health_check():
+    """Health check endpoint for load balancers"""
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 # API Info endpoint
-@app.get("/api", tags=["Info"])
+@app.get("/api", response_class=Response, tags=["Info"])
 async def api_info():
     """API information and available endpoints"""
-    return {
-        "name": "SSB Coach 1A API",
-        "version": "1.0.0",
-        "description": "Advanced SSB Interview Preparation Platform",
-        "features": [
-            "User Authentication & Management",
-            "AI-Powered Test Analysis",
-            "Real-time Analytics",
-            "Gamification System",
-            "Coach & Center Management",
-            "Practice Test Engine",
-            "Progress Tracking",
-            "Admin Dashboard"
-        ],
-        "documentation": "/api/docs",
-        "redoc": "/api/redoc",
-        "health": "/health"
-    }
+    return Response(content=_API_INFO_BYTES, media_type="application/json")
 
 # Include route modules
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -124,69 +215,206 @@ app.include_router(coaches.router, prefix="/api/coaches", tags=["Coaches"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
+# Serve the OpenAPI schema from bytes serialized once per root path
+_OPENAPI_BYTES = {}
+
+def openapi_bytes(root_path):
+    """Return the serialized OpenAPI schema for a proxy root path"""
+    body = _OPENAPI_BYTES.get(root_path)
+    if body is None:
+        # Same as FastAPI's own route: advertise the proxy prefix so
+        # Swagger "Try it out" works behind a path-prefixing proxy
+        server_urls = [server.get("url") for server in app.servers]
+        if root_path and app.root_path_in_servers and root_path not in server_urls:
+            app.servers.insert(0, {"url": root_path})
+            app.openapi_schema = None
+        body = _OPENAPI_BYTES[root_path] = orjson.dumps(app.openapi())
+    return body
+
+if DOCS_ENABLED:
+    @app.get(OPENAPI_URL, response_class=Response, include_in_schema=False)
+    async def openapi_schema(request: Request):
+        """OpenAPI schema, serialized once per root path"""
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        return Response(content=openapi_bytes(root_path), media_type="application/json")
+
+    @app.get(DOCS_URL, include_in_schema=False)
+    async def swagger_ui(request: Request):
+        """Swagger UI documentation"""
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        return get_swagger_ui_html(
+            openapi_url=root_path + OPENAPI_URL,
+            title=f"{app.title} - Swagger UI",
+            oauth2_redirect_url=root_path + SWAGGER_OAUTH2_REDIRECT_URL,
+        )
+
+    @app.get(SWAGGER_OAUTH2_REDIRECT_URL, include_in_schema=False)
+    async def swagger_ui_redirect():
+        """Swagger UI OAuth2 redirect"""
+        return get_swagger_ui_oauth2_redirect_html()
+
+    @app.get(REDOC_URL, include_in_schema=False)
+    async def redoc(request: Request):
+        """ReDoc documentation"""
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        return get_redoc_html(
+            openapi_url=root_path + OPENAPI_URL,
+            title=f"{app.title} - ReDoc",
+        )
+
+async def ensure_indexes(collection, indexes, retired=()):
+    """Create only the indexes whose key pattern does not exist yet,
+    then drop any retired indexes that are still present.
+
+    Returns the number of indexes created and the names of existing
+    indexes whose options differ from the desired ones.
+    """
+    existing = await collection.list_indexes().to_list(None)
+    existing_by_key = {tuple(index["key"].items()): index for index in existing}
+    missing = []
+    mismatched_names = []
+    for index in indexes:
+        wanted = index.document
+        current = existing_by_key.get(tuple(wanted["key"].items()))
+        if current is None:
+            missing.append(index)
+            continue
+        # Same key but different options (e.g. a lost unique constraint)
+        # would otherwise be skipped silently
+        options = {k: v for k, v in wanted.items() if k not in ("key", "name")}
+        mismatched = {
+            k: current.get(k) for k, v in options.items() if current.get(k) != v
+        }
+        if mismatched:
+            mismatched_names.append(current["name"])
+            logger.warning(
+                f"⚠️ Index {current['name']} on {collection.name} has options "
+                f"{mismatched}, expected {options}"
+            )
+    if missing:
+        await collection.create_indexes(missing)
+    # Drop only after the replacements exist so queries always have an index
+    existing_names = {index["name"] for index in existing}
+    for name in retired:
+        if name in existing_names:
+            try:
+                await collection.drop_index(name)
+            except OperationFailure as e:
+                # Another worker dropped it first (IndexNotFound)
+                if e.code != 27:
+                    raise
+                continue
+            logger.info(f"🗑️ Dropped retired index {name} on {collection.name}")
+    return len(missing), mismatched_names
+
 async def create_database_indexes():
-    """Create database indexes for better performance"""
-    try:
-        # Users collection indexes
-        users_indexes = [
-            IndexModel([("email", ASCENDING)], unique=True),
-            IndexModel([("username", ASCENDING)], unique=True),
-            IndexModel([("role", ASCENDING)]),
-            IndexModel([("status", ASCENDING)]),
-            IndexModel([("created_at", DESCENDING)]),
-        ]
-        await database.db.users.create_indexes(users_indexes)
-        
-        # Tests collection indexes
-        tests_indexes = [
-            IndexModel([("type", ASCENDING)]),
-            IndexModel([("difficulty", ASCENDING)]),
-            IndexModel([("is_premium", ASCENDING)]),
-            IndexModel([("is_active", ASCENDING)]),
-            IndexModel([("created_at", DESCENDING)]),
-        ]
-        await database.db.tests.create_indexes(tests_indexes)
-        
-        # Test attempts collection indexes
-        attempts_indexes = [
-            IndexModel([("user_id", ASCENDING)]),
-            IndexModel([("test_id", ASCENDING)]),
-            IndexModel([("status", ASCENDING)]),
-            IndexModel([("started_at", DESCENDING)]),
-            IndexModel([("user_id", ASCENDING), ("test_id", ASCENDING)]),
-        ]
-        await database.db.test_attempts.create_indexes(attempts_indexes)
-        
-        # Coaches collection indexes
-        coaches_indexes = [
-            IndexModel([("service_branch", ASCENDING)]),
-            IndexModel([("is_featured", ASCENDING)]),
-            IndexModel([("is_active", ASCENDING)]),
-            IndexModel([("rating", DESCENDING)]),
-        ]
-        await database.db.coaches.create_indexes(coaches_indexes)
-        
-        # Analytics collection indexes
-        analytics_indexes = [
-            IndexModel([("user_id", ASCENDING)]),
-            IndexModel([("event_type", ASCENDING)]),
-            IndexModel([("timestamp", DESCENDING)]),
-            IndexModel([("date", DESCENDING)]),
-        ]
-        await database.db.analytics.create_indexes(analytics_indexes)
-        
-        # Gamification collection indexes
-        gamification_indexes = [
-            IndexModel([("user_id", ASCENDING)], unique=True),
-            IndexModel([("level", DESCENDING)]),
-            IndexModel([("points", DESCENDING)]),
-        ]
-        await database.db.gamification.create_indexes(gamification_indexes)
-        
-        logger.info("📊 Database indexes created successfully")
-        
-    except Exception as e:
-        logger.error(f"❌ Error creating database indexes: {str(e)}")
+    """Create database indexes for better performance.
+
+    Returns the names of collections whose indexes could not be created
+    or exist with the wrong options.
+    """
+    # Users collection indexes
+    users_indexes = [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("username", ASCENDING)], unique=True),
+        IndexModel([("role", ASCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("created_at", DESCENDING)]),
+    ]
+    
+    # Tests collection indexes
+    tests_indexes = [
+        IndexModel([("type", ASCENDING)]),
+        IndexModel([("difficulty", ASCENDING)]),
+        IndexModel([("is_premium", ASCENDING)]),
+        IndexModel([("is_active", ASCENDING)]),
+        IndexModel([("created_at", DESCENDING)]),
+    ]
+    
+    # Test attempts collection indexes
+    # Compound indexes follow the Equality, Sort, Range (ESR) rule;
+    # user_id alone is served by the user_id+status+started_at prefix
+    attempts_indexes = [
+        IndexModel([("test_id", ASCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("started_at", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING), ("started_at", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("test_id", ASCENDING), ("started_at", DESCENDING)]),
+    ]
+    
+    # Coaches collection indexes
+    coaches_indexes = [
+        IndexModel([("service_branch", ASCENDING)]),
+        IndexModel([("is_featured", ASCENDING)]),
+        IndexModel([("is_active", ASCENDING)]),
+        IndexModel([("rating", DESCENDING)]),
+    ]
+    
+    # Analytics collection indexes
+    # user_id alone is served by the user_id+event_type+timestamp prefix
+    analytics_indexes = [
+        IndexModel([("event_type", ASCENDING)]),
+        IndexModel([("timestamp", DESCENDING)]),
+        IndexModel([("date", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("event_type", ASCENDING), ("timestamp", DESCENDING)]),
+    ]
+    
+    # Gamification collection indexes
+    gamification_indexes = [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+        IndexModel([("level", DESCENDING)]),
+        IndexModel([("points", DESCENDING)]),
+    ]
+    
+    # Collections are independent, so check and build them concurrently;
+    # on restarts every index already exists and nothing is built
+    collection_indexes = {
+        "users": users_indexes,
+        "tests": tests_indexes,
+        "test_attempts": attempts_indexes,
+        "coaches": coaches_indexes,
+        "analytics": analytics_indexes,
+        "gamification": gamification_indexes,
+    }
+    # Indexes superseded by the compounds above; dropped where still present
+    retired_indexes = {
+        "test_attempts": ["user_id_1", "user_id_1_test_id_1"],
+        "analytics": ["user_id_1"],
+    }
+    results = await asyncio.gather(
+        *(
+            ensure_indexes(
+                database.db[name], indexes, retired_indexes.get(name, ())
+            )
+            for name, indexes in collection_indexes.items()
+        ),
+        return_exceptions=True
+    )
+    
+    # A failing collection must not hide indexes created for the others
+    failed = []
+    created = 0
+    for name, result in zip(collection_indexes, results):
+        if isinstance(result, Exception):
+            failed.append(name)
+            logger.error(f"❌ Error creating indexes for {name}: {str(result)}")
+            continue
+        new_count, mismatched = result
+        created += new_count
+        # A wrong option (e.g. missing unique) is as bad as a missing index
+        if mismatched:
+            failed.append(name)
+            logger.error(
+                f"❌ Indexes with wrong options on {name}: {', '.join(mismatched)}"
+            )
+    
+    if failed:
+        logger.warning(f"⚠️ Database indexes missing or invalid for: {', '.join(failed)}")
+    elif created:
+        logger.info(f"📊 Database indexes created successfully ({created} new)")
+    else:
+        logger.info("📊 Database indexes already up to date")
+    return failed
 
 async def init_sample_data():
     """Initialize sample data for development"""
@@ -198,51 +426,112 @@ async def init_sample_data():
         logger.error(f"❌ Error initializing sample data: {str(e)}")
 
 # Error handlers
-@app.exception_handler(HTTPException)
+@app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
-    logger.error(f"HTTP Exception: {exc.status_code} - {exc.detail}")
-    return {
-        "error": True,
-        "status_code": exc.status_code,
-        "message": exc.detail,
-        "timestamp": datetime.utcnow()
-    }
+    # Client errors (e.g. 404s from scanners) are routine, not server faults
+    if exc.status_code >= 500:
+        logger.error(f"HTTP Exception: {exc.status_code} - {exc.detail}")
+    else:
+        logger.info(f"HTTP Exception: {exc.status_code} - {exc.detail}")
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": True,
+            "status_code": exc.status_code,
+            "message": exc.detail,
+            "timestamp": datetime.utcnow()
+        },
+        headers=headers
+    )
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
     logger.error(f"Unhandled Exception: {str(exc)}")
-    return {
-        "error": True,
-        "status_code": 500,
-        "message": "Internal server error",
-        "timestamp": datetime.utcnow()
-    }
+    return ORJSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "error": True,
+            "status_code": 500,
+            "message": "Internal server error",
+            "timestamp": datetime.utcnow()
+        }
+    )
 
 # Middleware for request logging
-@app.middleware("http")
-async def log_requests(request, call_next):
-    """Log all incoming requests"""
-    start_time = datetime.utcnow()
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate processing time
-    process_time = (datetime.utcnow() - start_time).total_seconds()
-    
-    # Log request details
-    logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Time: {process_time:.3f}s"
-    )
-    
-    # Add timing header
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    return response
+PROCESS_TIME_HEADER = b"x-process-time"
+
+class TimingMiddleware:
+    """Log all incoming requests and add an X-Process-Time header (pure ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter_ns()
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = (time.perf_counter_ns() - start_time) / 1e9
+                headers = list(message.get("headers", []))
+                headers.append((PROCESS_TIME_HEADER, f"{process_time:.3f}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        # Process request
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Log request details once the response has been sent; an
+            # exception escaping here becomes a 500 further out
+            process_time = (time.perf_counter_ns() - start_time) / 1e9
+            logger.info(
+                f"{scope['method']} {scope['path']} - "
+                f"Status: {status_code or 500} - "
+                f"Time: {process_time:.3f}s"
+            )
+
+app.add_middleware(TimingMiddleware)
+
+class HealthCheckMiddleware:
+    """Answer GET /health from cached bytes before routing (pure ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"] != "/health"
+            or scope["method"] != "GET"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = _HEALTH_BYTES
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+# Added last so it runs outermost, ahead of every other middleware
+app.add_middleware(HealthCheckMiddleware)
 
 if __name__ == "__main__":
     """Run the application"""
@@ -252,5 +541,9 @@ if __name__ == "__main__":
         port=settings.PORT,
         reload=settings.DEBUG,
         log_level=settings.LOG_LEVEL.lower(),
-        access_log=True
+        # Requests are already logged by TimingMiddleware
+        access_log=False,
+        # Pin the fast event loop / HTTP parser instead of relying on "auto"
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     )
\ No newline at end of file
@@ -0,0 +1,7 @@
+#!/bin/sh
+# SSB Coach 1A Backend - Production entrypoint
+# Gunicorn master supervising Uvicorn workers (see gunicorn.conf.py)
+set -e
+
+cd "$(dirname "$0")/.."
+exec gunicorn main:app -c gunicorn.conf.py
@@ -0,0 +1,92 @@
+"""
+SSB Coach 1A Backend - Database Service
+MongoDB connection management with Motor
+"""
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import asyncio
+import logging
+import weakref
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class MongoClientPool:
+    """One Motor client per event loop.
+
+    A Motor client is bound to the loop it first runs on, so reloads and
+    tests that start a new loop get their own client instead of reusing
+    (or leaking) one attached to a different loop. Clients are keyed by the
+    loop object itself, so a new loop can never inherit a dead loop's client.
+    """
+
+    def __init__(self):
+        self._clients = weakref.WeakKeyDictionary()
+        self._databases = weakref.WeakKeyDictionary()
+
+    def get_client(self) -> AsyncIOMotorClient:
+        """Return the client for the running loop, creating it if needed"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = AsyncIOMotorClient(
+                settings.MONGODB_URL,
+                maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                maxConnecting=settings.MONGO_MAX_CONNECTING,
+                serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            )
+            self._clients[loop] = client
+        return client
+
+    def get_database(self) -> AsyncIOMotorDatabase:
+        """Return the database named in MONGODB_URL for the running loop"""
+        loop = asyncio.get_running_loop()
+        db = self._databases.get(loop)
+        if db is None:
+            db = self.get_client().get_default_database(default="ssbcoach1a")
+            self._databases[loop] = db
+        return db
+
+    def close_client(self):
+        """Close and forget the client for the running loop"""
+        loop = asyncio.get_running_loop()
+        self._databases.pop(loop, None)
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            client.close()
+
+class Database:
+    """MongoDB database handle shared by the application.
+
+    ``client`` and ``db`` resolve through the pool for the running event
+    loop, so each loop always sees its own connection.
+    """
+
+    def __init__(self):
+        self.pool = MongoClientPool()
+
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        """Motor client bound to the running event loop"""
+        return self.pool.get_client()
+
+    @property
+    def db(self) -> AsyncIOMotorDatabase:
+        """Application database on the running event loop's client"""
+        return self.pool.get_database()
+
+    def get_client(self) -> AsyncIOMotorClient:
+        """Return the Motor client bound to the running event loop"""
+        return self.pool.get_client()
+
+    async def connect(self):
+        """Create the client for the running event loop"""
+        logger.info(f"Using MongoDB database '{self.db.name}'")
+
+    async def disconnect(self):
+        """Close the client for the running event loop"""
+        self.pool.close_client()
+
+database = Database()